@@ -1,41 +1,93 @@
-import os, requests, pandas as pd, time, io
-from google.colab import files
+import os, requests, time, io, json
+from types import SimpleNamespace
+import threading
+from concurrent.futures import Future
+# pandas / google.colab / mobiles are imported in the cells that use them,
+# so the wallet + template pre-flight is not waiting on heavy imports.
 
 API_KEY = "api key here"
 BASE    = "https://www.fast2sms.com/dev"
 ALLOWED = [118457,# message id will come here]
+REFRESH_TEMPLATES = False   # True → ignore the cache and re-pull templates this run
+
+TPL_CACHE = "dlt_templates.json"
+TPL_TTL   = 24 * 3600       # seconds
 
 # --- Wallet check --------------------------------------------------------
-bal = float(requests.get(f"{BASE}/wallet",
-                         params={"authorization":API_KEY}).json()["wallet"])  # Fast2SMS wallet endpoint :contentReference[oaicite:4]{index=4}
-print(f"Current wallet ₹{bal}")
-if bal < 1000:
-    raise SystemExit("⛔  Balance below ₹1 000 – top‑up before sending")
+def get_wallet():
+    return float(requests.get(f"{BASE}/wallet",
+                              params={"authorization":API_KEY},
+                              timeout=10).json()["wallet"])  # Fast2SMS wallet endpoint :contentReference[oaicite:4]{index=4}
 
-# --- Template pull -------------------------------------------------------
-def get_templates():
+# --- Template pull (full catalogue, cached on disk) ----------------------
+def fetch_templates():
     r = requests.get(f"{BASE}/dlt_manager",
                      params={"authorization":API_KEY,"type":"template"},
                      timeout=15).json()
     if not r.get("success"):
         raise RuntimeError(r)
-    rows = []
-    for s in r["data"]:
-        for t in s["templates"]:
-            if int(t["message_id"]) in ALLOWED:
-                rows.append({"id":int(t["message_id"]),
-                             "sender":s["sender_id"],
-                             "vars":int(t["var_count"]),
-                             "text":t["message"]})
-    return pd.DataFrame(rows)
-
-tpl_df = get_templates()
-print("Available IDs:", list(tpl_df.id))
+    rows = [{"id":int(t["message_id"]),
+             "sender":s["sender_id"],
+             "vars":int(t["var_count"]),
+             "text":t["message"]}
+            for s in r["data"] for t in s["templates"]]
+    with open(TPL_CACHE, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at":time.time(), "templates":rows}, f, ensure_ascii=False)
+    return rows
+
+def cached_templates():
+    if REFRESH_TEMPLATES:
+        return None
+    try:
+        with open(TPL_CACHE, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cache.get("fetched_at", 0) > TPL_TTL:
+        return None
+    if set(ALLOWED) - {t["id"] for t in cache["templates"]}:   # newly approved IDs → re-pull
+        return None
+    return cache["templates"]
+
+# Daemon threads (not a ThreadPoolExecutor, whose exit hook joins its workers)
+# so a low balance exits at once instead of waiting out the template listing.
+def in_background(fn):
+    fut = Future()
+    def run():
+        try:
+            fut.set_result(fn())
+        except Exception as e:
+            fut.set_exception(e)
+    threading.Thread(target=run, daemon=True).start()
+    return fut
+
+# wallet and (if the cache is cold) template listing run side by side
+templates = cached_templates()
+wallet  = in_background(get_wallet)
+pending = in_background(fetch_templates) if templates is None else None
+bal = wallet.result()
+print(f"Current wallet ₹{bal}")
+if bal < 1000:
+    raise SystemExit("⛔  Balance below ₹1 000 – top‑up before sending")
+if pending:
+    templates = pending.result()
+else:
+    print(f"Templates from {TPL_CACHE} (set REFRESH_TEMPLATES = True to re-pull)")
+
+tpl = {t["id"]: SimpleNamespace(**t) for t in templates if t["id"] in ALLOWED}
+print("Available IDs:", list(tpl))
 
 ###############################################################################################################################################################################################################
 
+import pandas as pd
+from google.colab import files
+
 msg_id = int(input("Enter Message‑ID from the list above: "))
-row    = tpl_df.set_index("id").loc[msg_id]
+if msg_id not in tpl:                                   # cache may predate this ID
+    tpl = {t["id"]: SimpleNamespace(**t) for t in fetch_templates() if t["id"] in ALLOWED}
+if msg_id not in tpl:
+    raise SystemExit(f"⛔  Message‑ID {msg_id} not found among ALLOWED approved templates: {list(tpl)}")
+row    = tpl[msg_id]
 print(f"\nSender: {row.sender} | Vars needed: {row.vars}\n{row.text}")
 
 cols = ["mobile"] + [f"v{i}" for i in range(1, row.vars+1)]
@@ -44,6 +96,8 @@ files.download(f"sample_{msg_id}.csv")
 
 ###############################################################################################################################################################################################################
 
+from mobiles import clean_recipients
+
 print("📤 Select the filled CSV / Excel file …")
 up = files.upload()
 fname = next(iter(up))
@@ -54,6 +108,12 @@ if missing:
     raise ValueError(f"Missing columns: {missing}")
 df = df.fillna("")
 print(f"Loaded {len(df)} rows.")
+df, rejects = clean_recipients(df)
+if len(rejects):
+    rejects.to_csv(f"rejects_{msg_id}.csv", index=False)    # fresh per upload, not appended
+    print(f"Dropped {len(rejects)} rows →", rejects.reason.value_counts().to_dict(), f"(see rejects_{msg_id}.csv)")
+    files.download(f"rejects_{msg_id}.csv")
+print(f"Sending to {len(df)} unique valid mobiles.")
 df.head()
 
 
@@ -79,7 +139,7 @@ req_ids = []
 for i, r in df.iterrows():
     vars_pipe = "|".join(r[f"v{j}"] for j in range(1, row.vars+1))
     payload = {"route":"dlt","sender_id":row.sender,"message":str(msg_id),
-               "variables_values":vars_pipe,"numbers":str(r.mobile).strip()}
+               "variables_values":vars_pipe,"numbers":r.mobile}
     if any(ord(ch) > 127 for ch in row.text):        # Hindi/emoji → unicode :contentReference[oaicite:5]{index=5}
         payload["language"] = "unicode"
 
@@ -6,3 +6,11 @@ DB_DATABASE_INPUT = ''
 
 url = "https://wb.omni..com/whatsapp-cloud/messages"
 auth_token = '..28ta75pt2K--'
+
+# Blank / invalid / duplicate numbers are skipped and logged here
+REJECTS_FILE = 'rejected_numbers.csv'
+
+# On-demand profiling (kill -USR1 / -USR2 <pid>, or write "sample 60" to PROFILE_SOCKET)
+PROFILE_DIR = 'profiles'
+PROFILE_SECONDS = 30
+PROFILE_SOCKET = ''
@@ -0,0 +1,45 @@
+import os
+import pandas as pd
+
+# 10-digit Indian mobile, after stripping +91 / 0091 / 91 / 0 prefixes
+MOBILE_RE = r"[6-9]\d{9}"
+PREFIX_RE = r"^(?:0091|091|91|0)(?=[6-9]\d{9}$)"
+
+
+def normalize_mobiles(s):
+    s = pd.Series(s, dtype="object").fillna("").astype(str)
+    return (s.str.replace(r"\.0$", "", regex=True)          # Excel floats: 9876543210.0
+             .str.replace(r"\D", "", regex=True)             # spaces, dashes, +, ()
+             .str.replace(PREFIX_RE, "", regex=True))
+
+
+def clean_recipients(df, col="mobile", rejects_path=None, dedup_on=()):
+    """Normalize `col` and drop blank / invalid / duplicate rows.
+
+    Duplicates are judged on the normalized number plus any `dedup_on`
+    columns; the first occurrence is kept. `df` is left unchanged: returns
+    (kept, rejects), where `kept` carries the normalized numbers, and appends
+    rejects (with a `reason` column) to `rejects_path` if given.
+    """
+    if df.empty:
+        return df.copy(), df.assign(reason="")
+
+    norm = normalize_mobiles(df[col])
+    valid = norm.str.fullmatch(MOBILE_RE)
+    dup = valid & pd.concat([norm, df[list(dedup_on)]], axis=1).duplicated()
+
+    blank = pd.Series(df[col], dtype="object").fillna("").astype(str).str.strip().eq("")
+
+    reason = pd.Series("", index=df.index)
+    reason[blank] = "blank"
+    reason[~blank & ~valid] = "invalid"           # includes "N/A", "abc", ...
+    reason[dup] = "duplicate"
+
+    bad = reason.ne("")
+    rejects = df[bad].assign(reason=reason[bad])
+    kept = df[~bad].assign(**{col: norm[~bad]})
+
+    if rejects_path and not rejects.empty:
+        rejects.to_csv(rejects_path, mode="a", index=False,
+                       header=not os.path.exists(rejects_path))
+    return kept, rejects
@@ -0,0 +1,162 @@
+import cProfile
+import collections
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+# Off by default: install() only registers signal handlers (and optionally a
+# control socket thread blocked on accept), nothing runs until a window starts.
+#
+#   kill -USR1 <pid>                          -> stack samples  (.collapsed)
+#   kill -USR2 <pid>                          -> cProfile stats (.pstats)
+#   echo "sample 60" | nc -U <socket_path>    -> same, via the control socket
+
+MODES = {'sample': 'SIGUSR1', 'cprofile': 'SIGUSR2'}
+
+_settings = {'out_dir': 'profiles', 'seconds': 30, 'interval': 0.005}
+# Handlers can interrupt each other (and the main thread) between bytecodes,
+# so state is claimed/released with single atomic dict operations instead of a
+# lock: 'active' holds a (mode,) tuple only while a window is running.
+_state = {}
+_main_ident = None
+
+
+def install(out_dir = 'profiles', seconds = 30, interval = 0.005, socket_path = None):
+    global _main_ident
+    if not hasattr(signal, 'SIGUSR1'):
+        logging.warning("Profiling hook not available on this platform")
+        return
+    if seconds <= 0:
+        # setitimer(..., 0) disarms the timer, so a cProfile window would never end
+        raise ValueError(f"Profiling window must be positive, got PROFILE_SECONDS = {seconds!r}")
+    _settings.update(out_dir = out_dir, seconds = seconds, interval = interval)
+    _main_ident = threading.main_thread().ident
+    signal.signal(signal.SIGUSR1, _on_signal)
+    signal.signal(signal.SIGUSR2, _on_signal)
+    signal.signal(signal.SIGALRM, _stop_cprofile)
+    if socket_path:
+        threading.Thread(target = _serve, args = (socket_path,), daemon = True).start()
+    logging.info(f"Profiling hook ready (pid {os.getpid()}): SIGUSR1 = sample, SIGUSR2 = cprofile")
+
+
+def _output_path(ext):
+    os.makedirs(_settings['out_dir'], exist_ok = True)
+    name = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(_settings['out_dir'], f"{name}-{os.getpid()}-{stamp}.{ext}")
+
+
+def _on_signal(signum, frame):
+    mode = 'sample' if signum == signal.SIGUSR1 else 'cprofile'
+    seconds = _state.pop('requested', None) or _settings['seconds']
+    claim = (mode,)
+    current = _state.setdefault('active', claim)
+    if current is not claim:
+        logging.warning(f"Profiling already running ({current[0]}), ignoring {mode} request")
+        return
+
+    try:
+        if mode == 'sample':
+            path = _output_path('collapsed')
+            threading.Thread(target = _sample, args = (seconds, path), daemon = True).start()
+        else:
+            # cProfile hooks the thread that enables it; signal handlers always run
+            # on the main thread, which is the dispatcher loop we want to measure.
+            path = _output_path('pstats')
+            profiler = cProfile.Profile()
+            _state['profiler'] = (profiler, path)
+            profiler.enable()
+            signal.setitimer(signal.ITIMER_REAL, seconds)
+    except Exception as e:
+        logging.error(f"Profiling failed to start: {e}", exc_info = True)
+        running = _state.pop('profiler', None)
+        if running is not None:
+            running[0].disable()
+        _state.pop('active', None)
+        return
+    logging.info(f"Profiling started: {mode} for {seconds}s -> {path}")
+
+
+def _stop_cprofile(signum, frame):
+    running = _state.pop('profiler', None)
+    if running is None:
+        return
+    profiler, path = running
+    profiler.disable()
+    try:
+        profiler.dump_stats(path)
+        logging.info(f"Profiling finished: {path}")
+    except Exception as e:
+        logging.error(f"Profiling failed: {e}", exc_info = True)
+    finally:
+        _state.pop('active', None)
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _sample(seconds, path):
+    stacks = collections.Counter()
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(_main_ident)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                stacks[';'.join(reversed(stack))] += 1
+            time.sleep(_settings['interval'])
+
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logging.info(f"Profiling finished: {path} ({sum(stacks.values())} samples)")
+    except Exception as e:
+        logging.error(f"Profiling failed: {e}", exc_info = True)
+    finally:
+        _state.pop('active', None)
+
+
+def _handle_command(line):
+    parts = line.split()
+    if not parts or parts[0] not in MODES:
+        return f"error: expected one of {', '.join(MODES)} [seconds]"
+    try:
+        seconds = float(parts[1]) if len(parts) > 1 else _settings['seconds']
+    except ValueError:
+        return f"error: bad duration {parts[1]!r}"
+    if seconds <= 0:
+        return "error: duration must be positive"
+    current = _state.get('active')
+    if current:
+        return f"busy: {current[0]} already running"
+    _state['requested'] = seconds
+    # Route through the signal handler so the work starts on the main thread.
+    os.kill(os.getpid(), getattr(signal, MODES[parts[0]]))
+    return f"ok: {parts[0]} for {seconds}s -> {_settings['out_dir']}"
+
+
+def _serve(socket_path):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(1)
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            conn.settimeout(5)
+            try:
+                line = conn.makefile('r').readline()
+                conn.sendall((_handle_command(line) + "\n").encode())
+            except Exception as e:
+                logging.error(f"Profiling control socket error: {e}")
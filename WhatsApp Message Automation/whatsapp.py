@@ -1,6 +1,9 @@
 import mysql.connector
 from minsureconfig import *
 from whatsapptemplates import WHATSAPP_TEMPLATES
+import profilehook
+from mobiles import clean_recipients
+import pandas as pd
 import requests
 import datetime
 import time
@@ -60,6 +63,31 @@ def template_not_found(message_id):
     input_connect.commit()
 
 
+def reject_messages(message_ids, reason):
+    # template_name = 'rejected:<reason>' tells these apart from rows that failed 3 real sends
+    cursor = input_connect.cursor()
+    update_query = ("UPDATE whatsapp_msg_queue SET try_count = 3, last_mod_date = NOW(), template_name = %s "
+                    "WHERE id IN (" + ", ".join(["%s"] * len(message_ids)) + ")")
+    cursor.execute(update_query, (f"rejected:{reason}", *message_ids))
+    input_connect.commit()
+
+
+def drop_bad_recipients(messages):
+    # Filtering must never stop the worker: on any error send the batch unfiltered.
+    try:
+        df = pd.DataFrame(messages, columns = ['id', 'whatsapp_no', 'msg_template', 'variables'])
+        kept, rejects = clean_recipients(df, 'whatsapp_no', rejects_path = REJECTS_FILE,
+                                         dedup_on = ('msg_template', 'variables'))
+        for reason, group in rejects.groupby('reason'):
+            ids = group.id.tolist()
+            logging.error(f"Rejected {len(ids)} messages ({reason} number): ids {ids}")
+            reject_messages(ids, reason)
+        return list(kept.itertuples(index = False, name = None))
+    except Exception as e:
+        logging.error(f"Recipient validation failed, sending batch unfiltered: {e}", exc_info = True)
+        return messages
+
+
 def send_whatsapp_message_with_variables2(to_phone, temp_name, variables,language):
 
     variables_list = variables.split('|')
@@ -108,10 +136,13 @@ if __name__ == '__main__':
         typeSMS = False
         typeStr = False
 
+    profilehook.install(out_dir = PROFILE_DIR, seconds = PROFILE_SECONDS, socket_path = PROFILE_SOCKET or None)
+
     while True:
         cursor_input, input_connect = get_cursor()
         messages = fetch_message_details(typeStr,cursor_input)
         if messages:
+            messages = drop_bad_recipients(messages)
             for message in messages:
                 try:
 